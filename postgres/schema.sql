@@ -1,5 +1,8 @@
 -- Hedge Fund Tracker Schema
 -- Optimized for: ticker → funds AND fund → holdings queries
+--
+-- Idempotent: applied on first start by docker-entrypoint-initdb.d and again
+-- by src/initialize_db.py on every load, which upgrades existing databases.
 
 -- =============================================================================
 -- CORE TABLES
@@ -39,25 +42,83 @@ CREATE TABLE IF NOT EXISTS holdings (
     security_id INTEGER REFERENCES securities(id),
     shares BIGINT NOT NULL,
     value BIGINT NOT NULL,  -- in dollars
+    line_count INTEGER,  -- 13F lines summed into this row; NULL when loaded unaggregated
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Columns added after the initial release, for databases created before them
+ALTER TABLE holdings ADD COLUMN IF NOT EXISTS line_count INTEGER;
+
+-- CUSIP → ticker lookups (src/ticker_resolver.py); ticker is NULL for misses
+CREATE TABLE IF NOT EXISTS cusip_tickers (
+    cusip VARCHAR(9) PRIMARY KEY,
+    ticker VARCHAR(10),
+    source VARCHAR(50),
+    resolved_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- =============================================================================
+-- ANALYTICS TABLES (computed per quarter by src/analytics.py)
+-- =============================================================================
+
+-- Crowding per security
+CREATE TABLE IF NOT EXISTS security_crowding (
+    quarter VARCHAR(7) NOT NULL,
+    security_id INTEGER REFERENCES securities(id),
+    holder_count INTEGER NOT NULL,
+    total_value BIGINT NOT NULL,
+    hhi DOUBLE PRECISION NOT NULL,  -- Herfindahl index of holder shares, 0-1
+    aum_share DOUBLE PRECISION NOT NULL,  -- share of tracked-fund AUM
+    PRIMARY KEY (quarter, security_id)
+);
+
+-- Concentration per fund
+CREATE TABLE IF NOT EXISTS fund_concentration (
+    quarter VARCHAR(7) NOT NULL,
+    hedge_fund_id INTEGER REFERENCES hedge_funds(id),
+    position_count INTEGER NOT NULL,
+    total_value BIGINT NOT NULL,
+    top10_weight DOUBLE PRECISION NOT NULL,
+    hhi DOUBLE PRECISION NOT NULL,  -- Herfindahl index of position weights, 0-1
+    active_share DOUBLE PRECISION NOT NULL,  -- vs. aggregate tracked-fund portfolio
+    PRIMARY KEY (quarter, hedge_fund_id)
+);
+
+-- Position weights within each fund
+CREATE TABLE IF NOT EXISTS position_weights (
+    quarter VARCHAR(7) NOT NULL,
+    hedge_fund_id INTEGER REFERENCES hedge_funds(id),
+    security_id INTEGER REFERENCES securities(id),
+    weight DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (quarter, hedge_fund_id, security_id)
+);
+
 -- =============================================================================
 -- INDEXES FOR FAST QUERIES
 -- =============================================================================
 
 -- For "which funds own this stock?" queries
-CREATE INDEX idx_holdings_security ON holdings(security_id);
-CREATE INDEX idx_securities_cusip ON securities(cusip);
-CREATE INDEX idx_securities_ticker ON securities(ticker);
+CREATE INDEX IF NOT EXISTS idx_holdings_security ON holdings(security_id);
+CREATE INDEX IF NOT EXISTS idx_securities_cusip ON securities(cusip);
+CREATE INDEX IF NOT EXISTS idx_securities_ticker ON securities(ticker);
 
 -- For "what does this fund hold?" queries
-CREATE INDEX idx_holdings_filing ON holdings(filing_id);
-CREATE INDEX idx_filings_fund ON filings(hedge_fund_id);
-CREATE INDEX idx_filings_quarter ON filings(quarter);
+CREATE INDEX IF NOT EXISTS idx_holdings_filing ON holdings(filing_id);
+
+-- One aggregated row per filing and security, enabling upserts
+CREATE UNIQUE INDEX IF NOT EXISTS idx_holdings_filing_security ON holdings(filing_id, security_id)
+    WHERE line_count IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_filings_fund ON filings(hedge_fund_id);
+-- For quarter-scoped dashboard queries: filter filings by quarter first
+DROP INDEX IF EXISTS idx_filings_quarter;  -- superseded by idx_filings_quarter_fund
+CREATE INDEX IF NOT EXISTS idx_filings_quarter_fund ON filings(quarter, hedge_fund_id) INCLUDE (id);
 
 -- For fund lookups
-CREATE INDEX idx_hedge_funds_cik ON hedge_funds(cik);
+CREATE INDEX IF NOT EXISTS idx_hedge_funds_cik ON hedge_funds(cik);
+
+-- For "most crowded securities" and per-security weight lookups
+CREATE INDEX IF NOT EXISTS idx_security_crowding_holders ON security_crowding(quarter, holder_count DESC);
+CREATE INDEX IF NOT EXISTS idx_position_weights_security ON position_weights(quarter, security_id);
 
 -- =============================================================================
 -- USEFUL VIEWS
@@ -104,7 +165,7 @@ SELECT
     hf.cik,
     hf.name as fund_name,
     f.quarter,
-    COUNT(h.id) as position_count,
+    COUNT(DISTINCT h.security_id) as position_count,
     SUM(h.value) as total_value,
     f.filing_date
 FROM holdings h
@@ -0,0 +1,197 @@
+"""
+Ingestion Run Checkpoints
+=========================
+
+Spools each filing's parsed holdings to disk as soon as it is extracted and
+tracks completed stages and filings in a run manifest, so an interrupted
+``initialize_db`` run can resume with ``--resume`` instead of starting over.
+
+Layout:
+    data/runs/<quarter>/manifest.json            Completed stages and matched funds
+    data/runs/<quarter>/filings.jsonl            One line per completed filing
+    data/runs/<quarter>/holdings/<accession>.csv Parsed holdings per filing
+
+Spool files and the manifest are written to a temporary path and renamed
+into place. A filing is only appended to the journal once its spool file
+exists, so a crash never leaves a filing recorded without its holdings.
+"""
+
+from datetime import datetime, timezone
+from pydantic import BaseModel, Field
+
+import json
+import os
+import shutil
+import pandas as pd
+
+from .get_hedge_funds import HedgeFund
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+RUNS_DIR = os.path.join(DATA_DIR, "runs")
+
+# Read back as text so CUSIPs keep their leading zeros
+SPOOL_DTYPES = {
+    "cusip": str,
+    "name": str,
+    "ticker": str,
+    "class_title": str,
+    "filing_date": str,
+}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class FilingCheckpoint(BaseModel):
+    cik: int
+    company: str
+    filing_date: str
+    holdings: int
+
+
+class RunManifest(BaseModel):
+    quarter: str
+    started_at: str = Field(default_factory=_now)
+    updated_at: str = Field(default_factory=_now)
+    stages: dict[str, str] = Field(default_factory=dict)  # stage -> completed at
+    hedge_funds: list[HedgeFund] = Field(default_factory=list)
+
+
+class UnfinishedRunError(RuntimeError):
+    """Raised when starting over would discard an unfinished run's spool."""
+
+    def __init__(self, path: str):
+        self.path = path
+        super().__init__(
+            f"An unfinished run exists in {path}. Use --resume to continue it "
+            "or --restart to discard it and start over."
+        )
+
+
+class RunCheckpoint:
+    """
+    Manifest and holdings spool for one quarter's ingestion run.
+
+    Args:
+        quarter: Quarter being ingested, e.g. 2025_Q4
+        runs_dir: Directory holding one spool directory per quarter
+    """
+
+    def __init__(self, quarter: str, runs_dir: str = RUNS_DIR):
+        self.path = os.path.join(runs_dir, quarter)
+        self.manifest_path = os.path.join(self.path, "manifest.json")
+        self.journal_path = os.path.join(self.path, "filings.jsonl")
+        self.spool_dir = os.path.join(self.path, "holdings")
+        self.manifest = RunManifest(quarter=quarter)
+        self.filings: dict[str, FilingCheckpoint] = {}
+
+    def start(self, resume: bool = False, restart: bool = False) -> bool:
+        """
+        Load the previous manifest when resuming, otherwise start a fresh spool.
+
+        A previous run that never finished loading is only discarded when
+        ``restart`` is set.
+
+        Returns:
+            Whether a previous run was resumed
+
+        Raises:
+            UnfinishedRunError: If an unfinished run exists and neither
+                ``resume`` nor ``restart`` is set
+        """
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                manifest = RunManifest.model_validate_json(f.read())
+            if resume:
+                self.manifest = manifest
+                self.filings = self._read_journal()
+                return True
+            if not restart and "load" not in manifest.stages:
+                raise UnfinishedRunError(self.path)
+
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._save()
+        return False
+
+    def is_done(self, stage: str) -> bool:
+        return stage in self.manifest.stages
+
+    def mark_done(self, stage: str):
+        self.manifest.stages[stage] = _now()
+        self._save()
+
+    @property
+    def hedge_funds(self) -> list[HedgeFund]:
+        return self.manifest.hedge_funds
+
+    def save_hedge_funds(self, hedge_funds: list[HedgeFund]):
+        """Record the matched funds and mark the matching stage done."""
+        self.manifest.hedge_funds = hedge_funds
+        self.mark_done("matching")
+
+    def has_filing(self, accession_no: str) -> bool:
+        return accession_no in self.filings
+
+    def save_filing(
+        self,
+        accession_no: str,
+        cik: int,
+        company: str,
+        filing_date: str,
+        records: list[dict],
+    ):
+        """Spool a filing's holdings, then record it as done in the journal."""
+        if records:
+            path = os.path.join(self.spool_dir, f"{accession_no}.csv")
+            pd.DataFrame(records).to_csv(f"{path}.tmp", index=False)
+            os.replace(f"{path}.tmp", path)
+
+        filing = FilingCheckpoint(
+            cik=cik, company=company, filing_date=filing_date, holdings=len(records)
+        )
+        with open(self.journal_path, "a") as f:
+            f.write(json.dumps({"accession_no": accession_no, **filing.model_dump()}))
+            f.write("\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.filings[accession_no] = filing
+
+    def load_holdings(self) -> list[dict]:
+        """Read back the spooled holdings of every completed filing."""
+        records = []
+        for accession_no, filing in self.filings.items():
+            if not filing.holdings:
+                continue
+            path = os.path.join(self.spool_dir, f"{accession_no}.csv")
+            df = pd.read_csv(path, dtype=SPOOL_DTYPES)
+            df = df.astype(object).where(df.notna(), None)
+            records.extend(df.to_dict("records"))
+        return records
+
+    def _read_journal(self) -> dict[str, FilingCheckpoint]:
+        filings = {}
+        if not os.path.exists(self.journal_path):
+            return filings
+        complete = 0
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                # A crash mid-append leaves at most one partial last line
+                if not line.endswith(b"\n"):
+                    break
+                entry = json.loads(line)
+                filings[entry.pop("accession_no")] = FilingCheckpoint(**entry)
+                complete += len(line)
+
+        # Drop the partial line so the next append starts on a fresh line
+        if complete < os.path.getsize(self.journal_path):
+            os.truncate(self.journal_path, complete)
+        return filings
+
+    def _save(self):
+        self.manifest.updated_at = _now()
+        os.makedirs(self.path, exist_ok=True)
+        with open(f"{self.manifest_path}.tmp", "w") as f:
+            f.write(self.manifest.model_dump_json(indent=2))
+        os.replace(f"{self.manifest_path}.tmp", self.manifest_path)
@@ -0,0 +1,185 @@
+"""
+Parallel Holdings Writer
+========================
+
+Writes holdings sharded by filing across a pool of psycopg 3 connections.
+
+Each shard (one filing, or several small filings bundled together) is
+written in its own transaction on a pooled connection, with statements sent
+in pipeline mode: each filing is one DELETE and one set-based INSERT, and
+the whole shard is flushed in a single round-trip. A failing shard rolls
+back on its own without touching the others; failures are collected and
+raised together once every shard has finished.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from psycopg_pool import ConnectionPool
+
+# One set-based statement per filing, with columns passed as arrays
+RAW_INSERT = """
+    INSERT INTO holdings (filing_id, security_id, shares, value)
+    SELECT %s, * FROM unnest(%s::int[], %s::bigint[], %s::bigint[])
+"""
+
+AGGREGATED_UPSERT = """
+    INSERT INTO holdings (filing_id, security_id, shares, value, line_count)
+    SELECT %s, * FROM unnest(%s::int[], %s::bigint[], %s::bigint[], %s::int[])
+    ON CONFLICT (filing_id, security_id) WHERE line_count IS NOT NULL
+    DO UPDATE SET
+        shares = EXCLUDED.shares,
+        value = EXCLUDED.value,
+        line_count = EXCLUDED.line_count
+"""
+
+
+class ShardWriteError(RuntimeError):
+    """Raised when one or more shards failed and were rolled back."""
+
+    def __init__(self, failures: dict[int, Exception]):
+        self.failures = failures
+        super().__init__(
+            f"{len(failures)} filing(s) failed and were rolled back: "
+            + ", ".join(str(f) for f in sorted(failures))
+        )
+
+
+class ParallelHoldingsWriter:
+    """
+    Write holdings for many filings in parallel.
+
+    Args:
+        database_url: libpq connection string
+        workers: Number of pooled connections writing concurrently
+        shard_rows: Filings smaller than this are bundled into one shard
+    """
+
+    def __init__(self, database_url: str, workers: int = 4, shard_rows: int = 5000):
+        self.database_url = database_url
+        self.workers = workers
+        self.shard_rows = shard_rows
+        self._done_filings = 0
+        self._done_rows = 0
+        self._start = 0.0
+        self._last_report = 0.0
+
+    def write(
+        self, rows_by_filing: dict[int, list[tuple]], aggregate: bool = False
+    ) -> int:
+        """
+        Replace the holdings of every filing in ``rows_by_filing``.
+
+        Rows are (filing_id, security_id, shares, value), plus line_count when
+        ``aggregate`` is set, in which case rows are upserted.
+
+        Returns:
+            The number of holdings written
+
+        Raises:
+            ShardWriteError: If any shard failed; its filings keep their old holdings
+        """
+        shards = self._plan_shards(rows_by_filing)
+        total_rows = sum(len(rows) for rows in rows_by_filing.values())
+        self._done_filings = 0
+        self._done_rows = 0
+        self._start = self._last_report = time.perf_counter()
+
+        failures: dict[int, Exception] = {}
+        written = 0
+
+        with ConnectionPool(
+            self.database_url, min_size=self.workers, max_size=self.workers, open=True
+        ) as pool:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = {
+                    executor.submit(self._write_shard, pool, shard, aggregate): shard
+                    for shard in shards
+                }
+                for future in as_completed(futures):
+                    shard = futures[future]
+                    try:
+                        written += future.result()
+                    except Exception as e:
+                        for filing_id, _ in shard:
+                            failures[filing_id] = e
+                        print(f"    Shard failed, rolled back: {e}")
+                    self._report(shard, len(rows_by_filing), total_rows)
+
+        if failures:
+            raise ShardWriteError(failures)
+        return written
+
+    def _plan_shards(
+        self, rows_by_filing: dict[int, list[tuple]]
+    ) -> list[list[tuple[int, list[tuple]]]]:
+        """Bundle filings into shards of roughly ``shard_rows`` rows, largest first."""
+        shards: list[list[tuple[int, list[tuple]]]] = []
+        current: list[tuple[int, list[tuple]]] = []
+        current_rows = 0
+
+        for filing_id, rows in sorted(
+            rows_by_filing.items(), key=lambda item: len(item[1]), reverse=True
+        ):
+            if current and current_rows + len(rows) > self.shard_rows:
+                shards.append(current)
+                current, current_rows = [], 0
+            current.append((filing_id, rows))
+            current_rows += len(rows)
+
+        if current:
+            shards.append(current)
+        return shards
+
+    def _write_shard(
+        self,
+        pool: ConnectionPool,
+        shard: list[tuple[int, list[tuple]]],
+        aggregate: bool,
+    ) -> int:
+        written = 0
+        with pool.connection() as conn:
+            # The transaction rolls back on any error, leaving the shard untouched
+            with conn.transaction(), conn.pipeline(), conn.cursor() as cur:
+                for filing_id, rows in shard:
+                    # Columns after filing_id, as arrays for unnest
+                    columns = [list(col) for col in zip(*rows)][1:] or [
+                        [] for _ in range(4 if aggregate else 3)
+                    ]
+                    if aggregate:
+                        # Drop unaggregated lines and positions absent from the new data
+                        cur.execute(
+                            """
+                            DELETE FROM holdings
+                            WHERE filing_id = %s
+                              AND (line_count IS NULL OR security_id <> ALL(%s))
+                        """,
+                            (filing_id, columns[0]),
+                        )
+                        cur.execute(AGGREGATED_UPSERT, (filing_id, *columns))
+                    else:
+                        cur.execute(
+                            "DELETE FROM holdings WHERE filing_id = %s", (filing_id,)
+                        )
+                        cur.execute(RAW_INSERT, (filing_id, *columns))
+                    written += len(rows)
+        return written
+
+    def _report(
+        self, shard: list[tuple[int, list[tuple]]], total_filings: int, total_rows: int
+    ):
+        self._done_filings += len(shard)
+        self._done_rows += sum(len(rows) for _, rows in shard)
+
+        # Report at most once a second, and always on the last shard
+        now = time.perf_counter()
+        if now - self._last_report < 1 and self._done_filings < total_filings:
+            return
+        self._last_report = now
+
+        elapsed = now - self._start
+        rate = self._done_rows / elapsed if elapsed else 0
+        print(
+            f"    [{self._done_filings}/{total_filings} filings] "
+            f"{self._done_rows}/{total_rows} holdings ({rate:,.0f} rows/s)"
+        )
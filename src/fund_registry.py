@@ -0,0 +1,150 @@
+"""
+Fund to CIK Registry
+====================
+
+Persists accepted fund name to CIK matches across runs, so only names that
+are new or were unmatched before go through the LLM variation and fuzzy
+matching stages.
+
+Known matches are confirmed against the quarter's 13F index by CIK lookup.
+A fund whose CIK does not appear in the index is matched again, in case it
+now files under a different entity.
+
+Files:
+    data/fund_registry.csv            Accepted matches (written by the loader)
+    data/fund_registry_overrides.csv  Manual ``fund_name,cik`` pins; a blank
+                                      CIK excludes the name from the universe
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+import os
+import pandas as pd
+
+from .get_hedge_funds import HedgeFund
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+REGISTRY_CSV = os.path.join(DATA_DIR, "fund_registry.csv")
+OVERRIDES_CSV = os.path.join(DATA_DIR, "fund_registry_overrides.csv")
+
+REGISTRY_COLUMNS = ["fund_name", "cik", "filer_name", "score", "matched_at"]
+
+
+class FundRegistry:
+    """
+    Accepted fund matches keyed by universe name, plus manual overrides.
+
+    Args:
+        registry_path: CSV of accepted matches
+        overrides_path: CSV of manual ``fund_name,cik`` overrides
+    """
+
+    def __init__(
+        self, registry_path: str = REGISTRY_CSV, overrides_path: str = OVERRIDES_CSV
+    ):
+        self.registry_path = registry_path
+        self.overrides_path = overrides_path
+        self.entries: dict[str, dict] = {}
+        self.overrides: dict[str, Optional[int]] = {}
+
+    @classmethod
+    def load(
+        cls, registry_path: str = REGISTRY_CSV, overrides_path: str = OVERRIDES_CSV
+    ) -> "FundRegistry":
+        registry = cls(registry_path, overrides_path)
+
+        if os.path.exists(registry_path):
+            df = pd.read_csv(registry_path, dtype={"fund_name": str, "filer_name": str})
+            for record in df.to_dict("records"):
+                record["cik"] = int(record["cik"])
+                registry.entries[record["fund_name"]] = record
+
+        if os.path.exists(overrides_path):
+            df = pd.read_csv(overrides_path, dtype={"fund_name": str})
+            for record in df.to_dict("records"):
+                cik = record.get("cik")
+                registry.overrides[record["fund_name"].strip()] = (
+                    None if pd.isna(cik) else int(cik)
+                )
+
+        return registry
+
+    def confirm(
+        self,
+        fund_names: list[str],
+        company_to_cik: dict[str, int],
+        rematch: bool = False,
+    ) -> tuple[list[HedgeFund], list[str]]:
+        """
+        Split the universe into funds confirmed from the registry and names to match.
+
+        Args:
+            fund_names: The quarter's fund universe
+            company_to_cik: Filer name to CIK from the quarter's 13F index
+            rematch: Ignore accepted matches (overrides still apply)
+
+        Returns:
+            (confirmed funds, names needing variation and matching)
+        """
+        cik_to_company = {cik: company for company, cik in company_to_cik.items()}
+
+        confirmed: list[HedgeFund] = []
+        to_match: list[str] = []
+
+        for name in fund_names:
+            if name in self.overrides:
+                cik = self.overrides[name]
+                # Pinned funds that didn't file this quarter are skipped, not re-matched
+                if cik is not None and cik in cik_to_company:
+                    confirmed.append(
+                        HedgeFund(
+                            name=cik_to_company[cik],
+                            cik=cik,
+                            matched_name=name,
+                            score=100.0,
+                        )
+                    )
+                continue
+
+            entry = None if rematch else self.entries.get(name)
+            if entry is not None and entry["cik"] in cik_to_company:
+                confirmed.append(
+                    HedgeFund(
+                        name=cik_to_company[entry["cik"]],
+                        cik=entry["cik"],
+                        matched_name=name,
+                        score=entry["score"],
+                    )
+                )
+            else:
+                to_match.append(name)
+
+        return confirmed, to_match
+
+    def record(self, matched: list[HedgeFund]):
+        """Accept new matches, replacing any earlier match for the same name."""
+        matched_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        for fund in matched:
+            self.entries[fund.matched_name] = {
+                "fund_name": fund.matched_name,
+                "cik": fund.cik,
+                "filer_name": fund.name,
+                "score": fund.score,
+                "matched_at": matched_at,
+            }
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.registry_path), exist_ok=True)
+        df = pd.DataFrame(list(self.entries.values()), columns=REGISTRY_COLUMNS)
+        df.sort_values("fund_name").to_csv(self.registry_path, index=False)
+
+
+def merge_matches(
+    confirmed: list[HedgeFund], matched: list[HedgeFund]
+) -> list[HedgeFund]:
+    """Combine confirmed and newly matched funds, keeping one fund per CIK."""
+    funds: dict[int, HedgeFund] = {}
+    for fund in confirmed + matched:
+        funds.setdefault(fund.cik, fund)
+    return list(funds.values())
@@ -0,0 +1,305 @@
+"""
+Fund Universe Sources
+=====================
+
+Registry of sources that contribute hedge fund names to the tracked universe.
+
+Each source is an async callable taking a ``SourceContext`` and returning a
+list of fund names. Sources are fetched concurrently over a shared
+``httpx.AsyncClient`` and remote responses are cached on disk keyed by URL,
+revalidated with ETag/Last-Modified so unchanged pages are neither
+redownloaded nor reparsed.
+
+Built-in sources:
+    wikipedia    Wikipedia 'List of hedge funds' page
+    csv          Local CSV of fund names (``name`` column)
+    13f_filers   Every 13F-HR filer in the quarterly index above an AUM threshold
+"""
+
+from pydantic import BaseModel, ConfigDict
+from typing import Any, Awaitable, Callable, Optional
+
+import asyncio
+import hashlib
+import httpx
+import json
+import lxml.html
+import os
+import pandas as pd
+import re
+
+from .utils import USER_AGENT
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+CACHE_DIR = os.path.join(DATA_DIR, "cache", "http")
+
+WIKIPEDIA_URL = "https://en.wikipedia.org/wiki/List_of_hedge_funds"
+FUND_UNIVERSE_CSV = os.path.join(DATA_DIR, "fund_universe.csv")
+DEFAULT_MIN_AUM = 1_000_000_000  # 13F table values are reported in dollars
+
+SEC_REQUESTS_PER_SECOND = 8  # SEC fair-access limit is 10/s
+SEC_ARCHIVES_URL = "https://www.sec.gov/Archives/edgar/data"
+
+TABLE_VALUE_TOTAL = re.compile(r"<(?:\w+:)?tableValueTotal>\s*([\d.]+)\s*<")
+
+
+class SourceContext(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    client: httpx.AsyncClient
+    filings: Any = None  # edgar Filings index for the quarter, if available
+    min_aum: float = DEFAULT_MIN_AUM
+    csv_path: str = FUND_UNIVERSE_CSV
+
+
+FundSource = Callable[[SourceContext], Awaitable[list[str]]]
+
+FUND_SOURCES: dict[str, FundSource] = {}
+
+
+def register_source(name: str) -> Callable[[FundSource], FundSource]:
+    """Register an async fund source under ``name``."""
+
+    def decorator(func: FundSource) -> FundSource:
+        FUND_SOURCES[name] = func
+        return func
+
+    return decorator
+
+
+class Throttle:
+    """Space out requests to at most ``per_second`` across concurrent tasks."""
+
+    def __init__(self, per_second: float):
+        self.interval = 1 / per_second
+        self._lock = asyncio.Lock()
+        self._next = 0.0
+
+    async def wait(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            delay = self._next - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next = loop.time() + self.interval
+
+
+def _cache_path(url: str) -> str:
+    return os.path.join(CACHE_DIR, f"{hashlib.sha1(url.encode()).hexdigest()}.json")
+
+
+def _read_cache(url: str) -> Optional[dict]:
+    path = _cache_path(url)
+    if not os.path.exists(path):
+        return None
+    # An unreadable entry (e.g. left by an older interrupted run) is a miss
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(url: str, entry: dict):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Write then rename, so an interrupted run never leaves a truncated entry
+    path = _cache_path(url)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(entry, f)
+    os.replace(f"{path}.tmp", path)
+
+
+async def fetch_cached(
+    client: httpx.AsyncClient,
+    url: str,
+    parse: Callable[[str], Any],
+    immutable: bool = False,
+    throttle: Optional[Throttle] = None,
+) -> Any:
+    """
+    Fetch ``url`` and return ``parse(body)``, caching the parsed payload.
+
+    The cache stores the parsed payload with the response validators, so a
+    ``304 Not Modified`` skips parsing entirely. Immutable URLs (e.g. SEC
+    archive documents) are served from cache without any request, and a 404
+    is cached as ``None`` for them.
+
+    Args:
+        client: Shared async HTTP client
+        url: URL to fetch
+        parse: Function turning the response text into a JSON-serialisable payload
+        immutable: Whether the resource can never change once published
+        throttle: Optional rate limiter applied before each request
+
+    Returns:
+        The parsed payload
+    """
+    cached = _read_cache(url)
+    if cached is not None and immutable:
+        return cached["payload"]
+
+    headers = {}
+    if cached is not None:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    if throttle:
+        await throttle.wait()
+    response = await client.get(url, headers=headers)
+
+    if response.status_code == 304 and cached is not None:
+        return cached["payload"]
+    if response.status_code == 404 and immutable:
+        payload = None
+    else:
+        response.raise_for_status()
+        payload = parse(response.text)
+
+    _write_cache(
+        url,
+        {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "payload": payload,
+        },
+    )
+    return payload
+
+
+def parse_wiki_hedge_fund_names(html_content: str) -> list[str]:
+    """
+    Extract all hedge fund names from the Wikipedia 'List of hedge funds' HTML.
+
+    Args:
+        html_content: The raw HTML content of the Wikipedia page
+
+    Returns:
+        A sorted list of hedge fund names extracted from the page
+    """
+    tree = lxml.html.fromstring(html_content)
+
+    hedge_funds = set()
+
+    # Extract from the "Largest hedge fund firms" table
+    for table in tree.xpath('//table[contains(@class, "wikitable")]'):
+        for row in table.xpath(".//tr")[1:]:  # Skip header row
+            cells = row.xpath(".//td")
+            if len(cells) >= 2:
+                # The fund name is typically in the second cell
+                links = cells[1].xpath(".//a")
+                if links:
+                    fund_name = links[0].text_content().strip()
+                    if fund_name:
+                        hedge_funds.add(fund_name)
+
+    # Extract from the "Notable hedge fund firms" lists (Americas, Asia-Pacific, EMEA)
+    for item in tree.xpath('//div[contains(@class, "div-col")]//li'):
+        links = item.xpath(".//a")
+        if links:
+            fund_name = links[0].text_content().strip()
+            if fund_name:
+                hedge_funds.add(fund_name)
+
+    return sorted(hedge_funds)
+
+
+def parse_13f_table_value(xml_content: str) -> Optional[float]:
+    """Extract the total reported value from a 13F-HR primary document."""
+    match = TABLE_VALUE_TOTAL.search(xml_content)
+    return float(match.group(1)) if match else None
+
+
+@register_source("wikipedia")
+async def wikipedia_source(ctx: SourceContext) -> list[str]:
+    return await fetch_cached(ctx.client, WIKIPEDIA_URL, parse_wiki_hedge_fund_names)
+
+
+@register_source("csv")
+async def csv_source(ctx: SourceContext) -> list[str]:
+    if not os.path.exists(ctx.csv_path):
+        print(f"  Fund universe CSV not found: {ctx.csv_path}")
+        return []
+
+    df = await asyncio.to_thread(pd.read_csv, ctx.csv_path, usecols=["name"])
+    return df["name"].dropna().astype(str).str.strip().tolist()
+
+
+@register_source("13f_filers")
+async def thirteenf_filers_source(ctx: SourceContext) -> list[str]:
+    if ctx.filings is None:
+        print("  13F filers source requires the quarterly filings index")
+        return []
+
+    # Keep one filing per filer; later entries in the index supersede earlier ones
+    latest_by_cik = {f.cik: f for f in ctx.filings}
+    throttle = Throttle(SEC_REQUESTS_PER_SECOND)
+
+    async def filer_aum(filing) -> Optional[float]:
+        accession = filing.accession_no.replace("-", "")
+        url = f"{SEC_ARCHIVES_URL}/{filing.cik}/{accession}/primary_doc.xml"
+        try:
+            return await fetch_cached(
+                ctx.client,
+                url,
+                parse_13f_table_value,
+                immutable=True,
+                throttle=throttle,
+            )
+        except httpx.HTTPError as e:
+            print(f"  Error fetching {url}: {e}")
+            return None
+
+    filers = list(latest_by_cik.values())
+    values = await asyncio.gather(*(filer_aum(f) for f in filers))
+
+    return [
+        f.company
+        for f, value in zip(filers, values)
+        if value is not None and value >= ctx.min_aum
+    ]
+
+
+async def get_fund_universe(
+    source_names: list[str],
+    filings=None,
+    min_aum: float = DEFAULT_MIN_AUM,
+    csv_path: str = FUND_UNIVERSE_CSV,
+) -> list[str]:
+    """
+    Fetch fund names from the given sources concurrently and merge them.
+
+    Args:
+        source_names: Names of registered sources to query
+        filings: edgar Filings index for the quarter (needed by ``13f_filers``)
+        min_aum: Minimum reported 13F value for the ``13f_filers`` source
+        csv_path: Path to the CSV used by the ``csv`` source
+
+    Returns:
+        A sorted, de-duplicated list of fund names
+    """
+    unknown = [name for name in source_names if name not in FUND_SOURCES]
+    if unknown:
+        raise ValueError(
+            f"Unknown fund source(s): {', '.join(unknown)}. "
+            f"Available: {', '.join(FUND_SOURCES)}"
+        )
+
+    async with httpx.AsyncClient(
+        headers={"User-Agent": USER_AGENT},
+        timeout=30,
+        follow_redirects=True,
+    ) as client:
+        ctx = SourceContext(
+            client=client, filings=filings, min_aum=min_aum, csv_path=csv_path
+        )
+        results = await asyncio.gather(
+            *(FUND_SOURCES[name](ctx) for name in source_names)
+        )
+
+    for name, names in zip(source_names, results):
+        print(f"  {name}: {len(names)} funds")
+
+    return sorted({name for names in results for name in names})
@@ -1,4 +1,3 @@
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from openai import AsyncOpenAI
 from pydantic import BaseModel, Field
@@ -6,7 +5,6 @@ from rapidfuzz import fuzz, process
 from typing import List, Optional
 
 import asyncio
-import httpx
 import os
 
 load_dotenv()
@@ -14,61 +12,6 @@ load_dotenv()
 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 
-USER_AGENT = f"{os.environ.get("APP_NAME")} {os.environ.get("EMAIL")}"
-
-
-def get_wiki_hedge_fund_names() -> list[str]:
-    """
-    Extract all hedge fund names from the Wikipedia 'List of hedge funds' HTML.
-
-    Args:
-        html_content: The raw HTML content of the Wikipedia page
-
-    Returns:
-        A list of hedge fund names extracted from the page
-    """
-
-    response = httpx.get(
-        "https://en.wikipedia.org/wiki/List_of_hedge_funds",
-        headers={"User-Agent": USER_AGENT},
-        timeout=30,
-    )
-    response.raise_for_status()
-
-    html_content = response.text
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    hedge_funds = set()
-
-    # Extract from the "Largest hedge fund firms" table
-    tables = soup.find_all("table", class_="wikitable")
-    for table in tables:
-        rows = table.find_all("tr")
-        for row in rows[1:]:  # Skip header row
-            cells = row.find_all("td")
-            if len(cells) >= 2:
-                # The fund name is typically in the second cell
-                fund_cell = cells[1]
-                link = fund_cell.find("a")
-                if link:
-                    fund_name = link.get_text(strip=True)
-                    if fund_name:
-                        hedge_funds.add(fund_name)
-
-    # Extract from the "Notable hedge fund firms" lists (Americas, Asia-Pacific, EMEA)
-    div_cols = soup.find_all("div", class_="div-col")
-    for div_col in div_cols:
-        list_items = div_col.find_all("li")
-        for item in list_items:
-            link = item.find("a")
-            if link:
-                fund_name = link.get_text(strip=True)
-                if fund_name:
-                    hedge_funds.add(fund_name)
-
-    # Sort and return as a list
-    return sorted(hedge_funds)
-
 
 openai_client = AsyncOpenAI()
 
@@ -90,6 +33,36 @@ class HedgeFund(BaseModel):
     score: float
 
 
+def match_exact_filer_names(
+    hedge_fund_names: list[str], company_to_cik: dict[str, int]
+) -> tuple[List[HedgeFund], list[str]]:
+    """
+    Match names that appear verbatim (ignoring case) among the 13F filers.
+
+    Returns:
+        (exactly matched funds, names that still need variations and fuzzy matching)
+    """
+    filer_names = {c.upper(): c for c in company_to_cik}
+    matched_funds: List[HedgeFund] = []
+    remaining: list[str] = []
+
+    for name in hedge_fund_names:
+        filer = filer_names.get(name.upper())
+        if filer is None:
+            remaining.append(name)
+            continue
+        matched_funds.append(
+            HedgeFund(
+                name=filer,
+                cik=company_to_cik[filer],
+                matched_name=name,
+                score=100.0,
+            )
+        )
+
+    return matched_funds, remaining
+
+
 def match_hedge_funds_to_filings(
     funds: List[HedgeFundNames], company_to_cik: dict[str, int], threshold: int = 95
 ) -> List[HedgeFund]:
@@ -157,9 +130,9 @@ async def get_name_variations(fund_name: str) -> HedgeFundNames | None:
     return hedge_fund
 
 
-async def get_hedge_fund_names_with_variations() -> List[HedgeFundNames]:
-    hedge_fund_names = get_wiki_hedge_fund_names()
-
+async def get_hedge_fund_names_with_variations(
+    hedge_fund_names: list[str],
+) -> List[HedgeFundNames]:
     tasks = [get_name_variations(fund_name) for fund_name in hedge_fund_names]
     results = await asyncio.gather(*tasks)
 
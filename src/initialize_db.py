@@ -7,6 +7,13 @@ Fetches 13F filings from SEC and populates the Postgres database.
 Usage:
     python initialize_db.py                    # Fetch from SEC
     python initialize_db.py --use-preloaded    # Load from CSV files    python initialize_db.py --refresh          # Clear DB and refetch
+    python initialize_db.py --sources wikipedia,csv,13f_filers --min-aum 5e9
+    python initialize_db.py --aggregate        # One row per filing and CUSIP
+    python initialize_db.py --workers 8        # Parallel holdings writers
+    python initialize_db.py --ticker-sources mapping_file,openfigi  # Tickers via OpenFIGI
+    python initialize_db.py --rematch          # Ignore the fund registry
+    python initialize_db.py --resume           # Continue an interrupted run
+    python initialize_db.py --restart          # Discard an interrupted run
 Prerequisites:
     1. Start Postgres: docker-compose up -d
 """
@@ -23,10 +30,17 @@ import psycopg2
 from typing import Optional
 
 from .utils import get_latest_quarter
+from .analytics import compute_and_store_analytics
+from .checkpoint import RunCheckpoint, UnfinishedRunError
+from .db_writer import ParallelHoldingsWriter, ShardWriteError
+from .fund_registry import FundRegistry, merge_matches
+from .fund_sources import DEFAULT_MIN_AUM, FUND_SOURCES, get_fund_universe
 from .get_hedge_funds import (
     get_hedge_fund_names_with_variations,
+    match_exact_filer_names,
     match_hedge_funds_to_filings,
 )
+from .ticker_resolver import DEFAULT_TICKER_SOURCES, TICKER_SOURCES, resolve_tickers
 
 load_dotenv()
 
@@ -40,6 +54,7 @@ EMAIL = os.getenv("EMAIL")
 edgar.set_identity(f"{APP_NAME} {EMAIL}")
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "..", "postgres", "schema.sql")
 
 
 class Holding(BaseModel):
@@ -58,6 +73,15 @@ def get_db_connection():
     return psycopg2.connect(DATABASE_URL)
 
 
+def apply_schema(conn):
+    """Apply the idempotent schema, upgrading databases created by older versions."""
+    with open(SCHEMA_PATH) as f:
+        schema = f.read()
+    with conn.cursor() as cur:
+        cur.execute(schema)
+    conn.commit()
+
+
 def clear_database(conn):
     """Clear all data from the database tables."""
     with conn.cursor() as cur:
@@ -96,6 +120,31 @@ def insert_hedge_funds(conn, hedge_funds) -> dict[int, int]:
     return cik_to_id
 
 
+async def fill_missing_tickers(
+    conn, holdings_data: list[Holding], ticker_sources: list[str]
+) -> int:
+    """Resolve tickers for holdings without one. Returns the number of CUSIPs filled."""
+    missing = {h.cusip for h in holdings_data if h.cusip and not h.ticker}
+
+    # Securities already stored with a ticker keep it on upsert
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT cusip FROM securities WHERE cusip = ANY(%s) AND ticker IS NOT NULL",
+            (list(missing),),
+        )
+        missing -= {row[0] for row in cur.fetchall()}
+    print(f"  {len(missing)} CUSIPs without a ticker")
+
+    if not missing or not ticker_sources:
+        return 0
+
+    tickers = await resolve_tickers(conn, missing, ticker_sources)
+    for h in holdings_data:
+        if not h.ticker and h.cusip in tickers:
+            h.ticker = tickers[h.cusip]
+    return len(tickers)
+
+
 def insert_securities(conn, holdings_data: list[Holding]) -> dict[str, int]:
     cusip_to_id = {}
     securities = {}
@@ -142,8 +191,104 @@ def insert_filing(conn, hedge_fund_id: int, filing_date: str, quarter: str) -> i
         return cur.fetchone()[0]
 
 
+def aggregate_holdings(
+    holdings_by_cik: dict, cik_to_id: dict, hf_id_to_filing_id: dict, cusip_to_id: dict
+) -> pd.DataFrame:
+    """
+    Collapse duplicate 13F lines into one row per (filing, security).
+
+    A 13F information table can list the same CUSIP once per other-manager or
+    investment-discretion line. Returns a frame with filing_id, security_id,
+    shares, value and line_count (the number of lines folded into the row).
+    """
+    df = pd.DataFrame(
+        [
+            (cik, h.cusip, h.shares or 0, h.value)
+            for cik, data in holdings_by_cik.items()
+            for h in data["holdings"]
+        ],
+        columns=["cik", "cusip", "shares", "value"],
+    )
+
+    df["filing_id"] = df["cik"].map(cik_to_id).map(hf_id_to_filing_id)
+    df["security_id"] = df["cusip"].map(cusip_to_id)
+    # Only require value, shares can be 0 for some securities
+    df = df[df["filing_id"].notna() & df["security_id"].notna() & (df["value"] != 0)]
+
+    return (
+        df.astype({"filing_id": "int64", "security_id": "int64"})
+        .groupby(["filing_id", "security_id"], as_index=False)
+        .agg(
+            shares=("shares", "sum"),
+            value=("value", "sum"),
+            line_count=("value", "size"),
+        )
+    )
+
+
+def aggregated_rows(aggregated: pd.DataFrame) -> list[tuple]:
+    """Return (filing_id, security_id, shares, value, line_count) tuples."""
+    return list(
+        aggregated[["filing_id", "security_id", "shares", "value", "line_count"]]
+        .astype("int64")
+        .itertuples(index=False, name=None)
+    )
+
+
+def upsert_aggregated_holdings(
+    conn, aggregated: pd.DataFrame, filing_ids: list[int]
+) -> int:
+    """Upsert aggregated holdings and drop rows the new filings no longer contain."""
+    rows = aggregated_rows(aggregated)
+
+    with conn.cursor() as cur:
+        # Remove unaggregated lines and positions absent from the new data
+        cur.execute(
+            """
+            DELETE FROM holdings h
+            WHERE h.filing_id = ANY(%s)
+              AND (
+                h.line_count IS NULL
+                OR NOT EXISTS (
+                    SELECT 1
+                    FROM unnest(%s::int[], %s::int[]) AS n(filing_id, security_id)
+                    WHERE n.filing_id = h.filing_id AND n.security_id = h.security_id
+                )
+              )
+        """,
+            (
+                filing_ids,
+                aggregated["filing_id"].tolist(),
+                aggregated["security_id"].tolist(),
+            ),
+        )
+
+        if rows:
+            execute_values(
+                cur,
+                """
+                INSERT INTO holdings (filing_id, security_id, shares, value, line_count)
+                VALUES %s
+                ON CONFLICT (filing_id, security_id) WHERE line_count IS NOT NULL
+                DO UPDATE SET
+                    shares = EXCLUDED.shares,
+                    value = EXCLUDED.value,
+                    line_count = EXCLUDED.line_count
+            """,
+                rows,
+            )
+
+    return len(rows)
+
+
 def insert_all_filings_and_holdings(
-    conn, holdings_by_cik: dict, cik_to_id: dict, cusip_to_id: dict, quarter_str: str
+    conn,
+    holdings_by_cik: dict,
+    cik_to_id: dict,
+    cusip_to_id: dict,
+    quarter_str: str,
+    aggregate: bool = False,
+    workers: int = 1,
 ):
     # First batch insert all filings
     filing_rows = []
@@ -178,10 +323,19 @@ def insert_all_filings_and_holdings(
         )
         hf_id_to_filing_id = {row[0]: row[1] for row in cur.fetchall()}
 
-    # Delete existing holdings for these filings
     filing_ids = list(hf_id_to_filing_id.values())
-    with conn.cursor() as cur:
-        cur.execute("DELETE FROM holdings WHERE filing_id = ANY(%s)", (filing_ids,))
+
+    if aggregate:
+        aggregated = aggregate_holdings(
+            holdings_by_cik, cik_to_id, hf_id_to_filing_id, cusip_to_id
+        )
+        if workers > 1:
+            return write_holdings_parallel(
+                conn, aggregated_rows(aggregated), filing_ids, workers, aggregate
+            )
+        total = upsert_aggregated_holdings(conn, aggregated, filing_ids)
+        conn.commit()
+        return total
 
     # Batch insert all holdings
     holding_rows = []
@@ -199,6 +353,15 @@ def insert_all_filings_and_holdings(
             ):  # Only require value, shares can be 0 for some securities
                 holding_rows.append((filing_id, security_id, h.shares or 0, h.value))
 
+    if workers > 1:
+        return write_holdings_parallel(
+            conn, holding_rows, filing_ids, workers, aggregate
+        )
+
+    # Delete existing holdings for these filings
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM holdings WHERE filing_id = ANY(%s)", (filing_ids,))
+
     if holding_rows:
         with conn.cursor() as cur:
             execute_values(
@@ -211,7 +374,28 @@ def insert_all_filings_and_holdings(
     return len(holding_rows)
 
 
-def extract_holdings_from_filing(filing) -> list[Holding]:
+def write_holdings_parallel(
+    conn,
+    holding_rows: list[tuple],
+    filing_ids: list[int],
+    workers: int,
+    aggregate: bool,
+) -> int:
+    """Write holdings sharded by filing across a pool of connections."""
+    # Writer connections must see the filings inserted on this connection
+    conn.commit()
+
+    # Include filings without rows so their stale holdings are still cleared
+    rows_by_filing: dict[int, list[tuple]] = {filing_id: [] for filing_id in filing_ids}
+    for row in holding_rows:
+        rows_by_filing[row[0]].append(row)
+
+    writer = ParallelHoldingsWriter(DATABASE_URL, workers=workers)
+    return writer.write(rows_by_filing, aggregate=aggregate)
+
+
+def extract_holdings_from_filing(filing) -> Optional[list[Holding]]:
+    """Parse a filing's share holdings. Returns None if the filing couldn't be read."""
     holdings = []
     try:
         thirteenf = filing.obj()
@@ -232,6 +416,7 @@ def extract_holdings_from_filing(filing) -> list[Holding]:
                 )
     except Exception as e:
         print(f"  Error: {e}")
+        return None
     return holdings
 
 
@@ -290,7 +475,18 @@ def load_from_csv(quarter_str) -> tuple[list, list[Holding]]:
     return hedge_funds, all_holdings
 
 
-async def main(use_preloaded: bool = False, refresh: bool = False):
+async def main(
+    use_preloaded: bool = False,
+    refresh: bool = False,
+    sources: Optional[list[str]] = None,
+    min_aum: float = DEFAULT_MIN_AUM,
+    aggregate: bool = False,
+    workers: int = 1,
+    ticker_sources: Optional[list[str]] = None,
+    rematch: bool = False,
+    resume: bool = False,
+    restart: bool = False,
+):
     print("=" * 60)
     print("Initialize Database with 13F Holdings")
     print("=" * 60)
@@ -305,6 +501,10 @@ async def main(use_preloaded: bool = False, refresh: bool = False):
         else ("Loading from CSV" if use_preloaded else "Fetching from SEC")
     )
     print(f"Mode: {mode}")
+    if aggregate:
+        print("Aggregating duplicate 13F lines per filing and CUSIP")
+
+    checkpoint: Optional[RunCheckpoint] = None
 
     if use_preloaded:
         # Load from CSV files
@@ -317,6 +517,20 @@ async def main(use_preloaded: bool = False, refresh: bool = False):
             print(f"Error: {e}")
             return
     else:
+        checkpoint = RunCheckpoint(quarter_str)
+        try:
+            resumed = checkpoint.start(resume, restart)
+        except UnfinishedRunError as e:
+            print(f"Error: {e}")
+            return
+        if resumed:
+            print(f"Resuming run from {checkpoint.path}")
+            print(f"  Stages done: {', '.join(checkpoint.manifest.stages) or 'none'}")
+            print(f"  Filings done: {len(checkpoint.filings)}")
+            if checkpoint.is_done("load"):
+                print("Run already complete, nothing to resume.")
+                return
+
         print("\nFetching 13F filings index from SEC...")
         filings = edgar.get_filings(year, quarter, form="13F-HR")
         if filings is None:
@@ -325,17 +539,44 @@ async def main(use_preloaded: bool = False, refresh: bool = False):
         company_to_cik = {f.company: f.cik for f in filings}
         print(f"  Total 13F-HR filings: {len(company_to_cik)}")
 
-        print("\nGetting hedge fund names and variations...")
-        hedge_fund_names = await get_hedge_fund_names_with_variations()
-        print(f"  Wikipedia hedge funds: {len(hedge_fund_names)}")
+        if checkpoint.is_done("matching"):
+            hedge_funds = checkpoint.hedge_funds
+            print(f"\nMatched hedge funds from checkpoint: {len(hedge_funds)}")
+        else:
+            print("\nFetching fund universe...")
+            universe = await get_fund_universe(
+                sources or ["wikipedia"], filings=filings, min_aum=min_aum
+            )
+            print(f"  Fund universe: {len(universe)} names")
 
-        print("\nMatching hedge funds to 13F filers...")
-        hedge_funds = match_hedge_funds_to_filings(hedge_fund_names, company_to_cik)
-        print(f"  Matched hedge funds: {len(hedge_funds)}")
+            print("\nChecking fund registry...")
+            registry = FundRegistry.load()
+            confirmed, to_match = registry.confirm(universe, company_to_cik, rematch)
+            print(f"  Confirmed from registry: {len(confirmed)}")
+            print(f"  New or unmatched names: {len(to_match)}")
 
-        if not hedge_funds:
-            print("Error: No hedge funds matched. Check matching threshold.")
-            return
+            # Names taken straight from the 13F index need no LLM variations
+            exact, to_vary = match_exact_filer_names(to_match, company_to_cik)
+            print(f"  Exact 13F filer names: {len(exact)}")
+
+            print("\nGetting hedge fund names and variations...")
+            hedge_fund_names = await get_hedge_fund_names_with_variations(to_vary)
+            print(f"  Hedge fund names: {len(hedge_fund_names)}")
+
+            print("\nMatching hedge funds to 13F filers...")
+            matched = merge_matches(
+                exact, match_hedge_funds_to_filings(hedge_fund_names, company_to_cik)
+            )
+            registry.record(matched)
+            registry.save()
+            hedge_funds = merge_matches(confirmed, matched)
+            print(f"  Newly matched: {len(matched)}")
+            print(f"  Matched hedge funds: {len(hedge_funds)}")
+
+            if not hedge_funds:
+                print("Error: No hedge funds matched. Check matching threshold.")
+                return
+            checkpoint.save_hedge_funds(hedge_funds)
 
         hedge_fund_ciks = {hf.cik for hf in hedge_funds}
         hedge_fund_13f = [f for f in filings if f.cik in hedge_fund_ciks]
@@ -344,31 +585,61 @@ async def main(use_preloaded: bool = False, refresh: bool = False):
         print("\nProcessing 13F filings...")
         print("-" * 60)
 
-        all_holdings: list[Holding] = []
+        # Each filing is spooled as soon as it is parsed; resumed runs skip those
+        pending = [
+            f for f in hedge_fund_13f if not checkpoint.has_filing(f.accession_no)
+        ]
+        if len(pending) < len(hedge_fund_13f):
+            print(
+                f"  Skipping {len(hedge_fund_13f) - len(pending)} filings already done"
+            )
 
-        for filing in hedge_fund_13f:
+        failed = 0
+        for filing in pending:
             print(f"  Processing: {filing.company}...")
 
             holdings = extract_holdings_from_filing(filing)
-            if holdings:
-                for h in holdings:
-                    h.cik = filing.cik
-                    h.filing_date = str(filing.filing_date)
+            if holdings is None:
+                failed += 1
+                print("    -> Failed, will be retried with --resume")
+                continue
 
-                all_holdings.extend(holdings)
+            for h in holdings:
+                h.cik = filing.cik
+                h.filing_date = str(filing.filing_date)
+            checkpoint.save_filing(
+                filing.accession_no,
+                filing.cik,
+                filing.company,
+                str(filing.filing_date),
+                [h.model_dump() for h in holdings],
+            )
+
+            if holdings:
                 print(f"    -> {len(holdings)} holdings")
             else:
                 print("    -> No holdings found")
 
+        if not failed:
+            checkpoint.mark_done("extraction")
+
+        all_holdings = [Holding(**record) for record in checkpoint.load_holdings()]
+
         print("-" * 60)
         print(f"Total holdings extracted: {len(all_holdings)}")
+        if failed:
+            print(f"{failed} filings failed; rerun with --resume to retry them")
 
         if not all_holdings:
             print("No holdings to insert.")
             return
 
-        print("\nExporting data to CSV...")
-        export_to_csv(hedge_funds, all_holdings, quarter_str)
+        # A partial run must not replace the preloaded CSVs
+        if checkpoint.is_done("extraction"):
+            print("\nExporting data to CSV...")
+            export_to_csv(hedge_funds, all_holdings, quarter_str)
+        else:
+            print("\nSkipping CSV export until every filing is extracted")
 
     print("\nConnecting to database...")
     try:
@@ -380,8 +651,15 @@ async def main(use_preloaded: bool = False, refresh: bool = False):
         return
 
     try:
-        # Clear database if refresh requested
-        if refresh:
+        print("\nApplying database schema...")
+        apply_schema(conn)
+
+        # Clear database if refresh requested, but never to load a partial run
+        extraction_complete = checkpoint is None or checkpoint.is_done("extraction")
+        if refresh and not extraction_complete:
+            print("\nNot clearing database: some filings failed to extract")
+            print("  Loading the filings that succeeded; rerun with --resume")
+        elif refresh:
             print("\nClearing database...")
             clear_database(conn)
 
@@ -390,6 +668,14 @@ async def main(use_preloaded: bool = False, refresh: bool = False):
         cik_to_id = insert_hedge_funds(conn, hedge_funds)
         print(f"  {len(cik_to_id)} hedge funds in database")
 
+        print("\nResolving missing tickers...")
+        n_filled = await fill_missing_tickers(
+            conn,
+            all_holdings,
+            DEFAULT_TICKER_SOURCES if ticker_sources is None else ticker_sources,
+        )
+        print(f"  {n_filled} tickers resolved")
+
         # Insert securities
         print("\nInserting securities...")
         cusip_to_id = insert_securities(conn, all_holdings)
@@ -407,9 +693,28 @@ async def main(use_preloaded: bool = False, refresh: bool = False):
             holdings_by_cik[cik]["holdings"].append(h)
 
         # Batch insert filings and holdings
-        total_holdings = insert_all_filings_and_holdings(
-            conn, holdings_by_cik, cik_to_id, cusip_to_id, quarter_str
-        )
+        try:
+            total_holdings = insert_all_filings_and_holdings(
+                conn,
+                holdings_by_cik,
+                cik_to_id,
+                cusip_to_id,
+                quarter_str,
+                aggregate,
+                workers,
+            )
+        except ShardWriteError as e:
+            print(f"Error: {e}")
+            print("Other filings were written; rerun to retry the failed ones.")
+            return
+
+        print("\nComputing crowding and concentration analytics...")
+        n_securities, n_funds = compute_and_store_analytics(conn, quarter_str)
+        print(f"  {n_securities} securities, {n_funds} funds")
+
+        # Only a run with every filing loaded is complete
+        if checkpoint and checkpoint.is_done("extraction"):
+            checkpoint.mark_done("load")
 
         print()
         print("=" * 60)
@@ -438,6 +743,65 @@ if __name__ == "__main__":
         action="store_true",
         help="Clear all database tables before inserting fresh data",
     )
+    parser.add_argument(
+        "--sources",
+        default="wikipedia",
+        help=f"Comma-separated fund universe sources ({', '.join(FUND_SOURCES)})",
+    )
+    parser.add_argument(
+        "--min-aum",
+        type=float,
+        default=DEFAULT_MIN_AUM,
+        help="Minimum reported 13F value in dollars for the 13f_filers source",
+    )
+    parser.add_argument(
+        "--aggregate",
+        action="store_true",
+        help="Store one row per filing and CUSIP, summing duplicate 13F lines",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Write holdings in parallel over this many database connections",
+    )
+    parser.add_argument(
+        "--ticker-sources",
+        default=",".join(DEFAULT_TICKER_SOURCES),
+        help=f"Comma-separated CUSIP to ticker sources ({', '.join(TICKER_SOURCES)}); "
+        "empty to skip resolution",
+    )
+    parser.add_argument(
+        "--rematch",
+        action="store_true",
+        help="Re-match every fund instead of confirming known CIKs from the registry",
+    )
+    run_mode = parser.add_mutually_exclusive_group()
+    run_mode.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume the quarter's last interrupted run, skipping completed work",
+    )
+    run_mode.add_argument(
+        "--restart",
+        action="store_true",
+        help="Discard the quarter's interrupted run and start over",
+    )
     args = parser.parse_args()
 
-    asyncio.run(main(use_preloaded=args.use_preloaded, refresh=args.refresh))
+    asyncio.run(
+        main(
+            use_preloaded=args.use_preloaded,
+            refresh=args.refresh,
+            sources=[s.strip() for s in args.sources.split(",") if s.strip()],
+            min_aum=args.min_aum,
+            aggregate=args.aggregate,
+            workers=args.workers,
+            ticker_sources=[
+                s.strip() for s in args.ticker_sources.split(",") if s.strip()
+            ],
+            rematch=args.rematch,
+            resume=args.resume,
+            restart=args.restart,
+        )
+    )
@@ -0,0 +1,242 @@
+"""
+Dashboard Queries
+=================
+
+Quarter-scoped queries behind the Streamlit dashboard.
+
+Every query starts from ``scoped_filings``: the filings of one quarter, found
+through the (quarter, hedge_fund_id) index, so its cost tracks a single
+quarter's holdings rather than the full history. With ``latest=True`` the
+scope is instead each fund's most recent filing up to and including that
+quarter, picked with ``DISTINCT ON``.
+
+Functions take an open SQLAlchemy connection so callers control pooling and
+caching.
+"""
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+QUARTER_FILINGS = """
+    scoped_filings AS (
+        SELECT id, hedge_fund_id
+        FROM filings
+        WHERE quarter = :quarter
+    )
+"""
+
+LATEST_FILINGS = """
+    scoped_filings AS (
+        SELECT DISTINCT ON (hedge_fund_id) id, hedge_fund_id
+        FROM filings
+        WHERE quarter <= :quarter
+        ORDER BY hedge_fund_id, quarter DESC
+    )
+"""
+
+
+def scoped_filings_cte(latest: bool = False) -> str:
+    """Return the ``scoped_filings`` CTE body for a quarter or latest-per-fund scope."""
+    return LATEST_FILINGS if latest else QUARTER_FILINGS
+
+
+def get_quarters(conn: Connection) -> list[str]:
+    """Return all loaded quarters, most recent first."""
+    query = "SELECT DISTINCT quarter FROM filings ORDER BY quarter DESC"
+    return [row[0] for row in conn.execute(text(query))]
+
+
+def get_securities_with_tickers(
+    conn: Connection, quarter: str, latest: bool = False
+) -> pd.DataFrame:
+    query = f"""
+        WITH {scoped_filings_cte(latest)}
+        SELECT MIN(s.id) as id, s.ticker, MIN(s.name) as name
+        FROM scoped_filings f
+        JOIN holdings h ON h.filing_id = f.id
+        JOIN securities s ON s.id = h.security_id
+        WHERE s.ticker IS NOT NULL
+        GROUP BY s.ticker
+        ORDER BY s.ticker
+    """
+    return pd.read_sql(text(query), conn, params={"quarter": quarter})
+
+
+def get_top_holders(
+    conn: Connection,
+    ticker: str,
+    quarter: str,
+    limit: int = 10,
+    latest: bool = False,
+) -> pd.DataFrame:
+    query = f"""
+        WITH {scoped_filings_cte(latest)}
+        SELECT
+            hf.name as fund_name,
+            SUM(h.value) as total_value,
+            SUM(h.shares) as total_shares
+        FROM scoped_filings f
+        JOIN holdings h ON h.filing_id = f.id
+        JOIN hedge_funds hf ON hf.id = f.hedge_fund_id
+        JOIN securities s ON s.id = h.security_id
+        WHERE s.ticker = :ticker
+        GROUP BY hf.id, hf.name
+        ORDER BY total_value DESC
+        LIMIT :limit
+    """
+    return pd.read_sql(
+        text(query),
+        conn,
+        params={"ticker": ticker, "quarter": quarter, "limit": limit},
+    )
+
+
+def get_related_holdings(
+    conn: Connection,
+    ticker: str,
+    quarter: str,
+    limit: int = 10,
+    latest: bool = False,
+) -> pd.DataFrame:
+    query = f"""
+        WITH {scoped_filings_cte(latest)},
+        filings_holding_security AS (
+            SELECT DISTINCT f.id
+            FROM scoped_filings f
+            JOIN holdings h ON h.filing_id = f.id
+            JOIN securities s ON s.id = h.security_id
+            WHERE s.ticker = :ticker
+        )
+        SELECT
+            COALESCE(s.ticker, s.name) as security_name,
+            s.ticker,
+            SUM(h.value) as total_value,
+            COUNT(DISTINCT f.hedge_fund_id) as fund_count
+        FROM scoped_filings f
+        JOIN holdings h ON h.filing_id = f.id
+        JOIN securities s ON s.id = h.security_id
+        WHERE f.id IN (SELECT id FROM filings_holding_security)
+          AND (s.ticker IS NULL OR s.ticker != :ticker)
+        GROUP BY s.ticker, s.name
+        ORDER BY total_value DESC
+        LIMIT :limit
+    """
+    return pd.read_sql(
+        text(query),
+        conn,
+        params={"ticker": ticker, "quarter": quarter, "limit": limit},
+    )
+
+
+def get_fund_coverage(
+    conn: Connection, ticker: str, quarter: str, latest: bool = False
+) -> tuple[int, int]:
+    """Return (funds holding ``ticker``, funds with a filing in scope)."""
+    query = f"""
+        WITH {scoped_filings_cte(latest)}
+        SELECT
+            (SELECT COUNT(DISTINCT hedge_fund_id) FROM scoped_filings) as total,
+            (
+                SELECT COUNT(DISTINCT f.hedge_fund_id)
+                FROM scoped_filings f
+                JOIN holdings h ON h.filing_id = f.id
+                JOIN securities s ON s.id = h.security_id
+                WHERE s.ticker = :ticker
+            ) as holding
+    """
+    row = conn.execute(text(query), {"ticker": ticker, "quarter": quarter}).one()
+    return int(row.holding), int(row.total)
+
+
+def get_all_holders(
+    conn: Connection, ticker: str, quarter: str, latest: bool = False
+) -> pd.DataFrame:
+    query = f"""
+        WITH {scoped_filings_cte(latest)}
+        SELECT
+            hf.name as "Fund Name",
+            SUM(h.value) as "Value ($)"
+        FROM scoped_filings f
+        JOIN holdings h ON h.filing_id = f.id
+        JOIN hedge_funds hf ON hf.id = f.hedge_fund_id
+        JOIN securities s ON s.id = h.security_id
+        WHERE s.ticker = :ticker
+        GROUP BY hf.id, hf.name
+        ORDER BY "Value ($)" DESC
+    """
+    return pd.read_sql(text(query), conn, params={"ticker": ticker, "quarter": quarter})
+
+
+def get_most_held_tickers(
+    conn: Connection, quarter: str, limit: int = 25, latest: bool = False
+) -> list[str]:
+    """Return the tickers held by the most funds in scope."""
+    query = f"""
+        WITH {scoped_filings_cte(latest)}
+        SELECT s.ticker
+        FROM scoped_filings f
+        JOIN holdings h ON h.filing_id = f.id
+        JOIN securities s ON s.id = h.security_id
+        WHERE s.ticker IS NOT NULL
+        GROUP BY s.ticker
+        ORDER BY COUNT(DISTINCT f.hedge_fund_id) DESC, SUM(h.value) DESC
+        LIMIT :limit
+    """
+    result = conn.execute(text(query), {"quarter": quarter, "limit": limit})
+    return [row[0] for row in result]
+
+
+def get_security_crowding(conn: Connection, ticker: str, quarter: str) -> pd.DataFrame:
+    """
+    Return crowding metrics for ``ticker`` across every CUSIP that carries it.
+
+    Each holder's value is rebuilt from its stored position weights and fund
+    total, so a fund holding several of the ticker's CUSIPs counts once, as in
+    the other views.
+    """
+    query = """
+        WITH holder_values AS (
+            SELECT pw.hedge_fund_id, SUM(pw.weight * fc.total_value) as value
+            FROM position_weights pw
+            JOIN securities s ON s.id = pw.security_id
+            JOIN fund_concentration fc
+                ON fc.quarter = pw.quarter AND fc.hedge_fund_id = pw.hedge_fund_id
+            WHERE pw.quarter = :quarter AND s.ticker = :ticker
+            GROUP BY pw.hedge_fund_id
+        )
+        SELECT
+            COUNT(*) as holder_count,
+            SUM(value) as total_value,
+            SUM(value * value) / (SUM(value) * SUM(value)) as hhi,
+            SUM(value) / (
+                SELECT SUM(total_value)::float8
+                FROM fund_concentration
+                WHERE quarter = :quarter
+            ) as aum_share
+        FROM holder_values
+        HAVING COUNT(*) > 0
+    """
+    return pd.read_sql(text(query), conn, params={"ticker": ticker, "quarter": quarter})
+
+
+def get_holder_concentration(
+    conn: Connection, ticker: str, quarter: str
+) -> pd.DataFrame:
+    """Return stored concentration metrics for every fund holding ``ticker``."""
+    query = """
+        SELECT
+            hf.name as "Fund Name",
+            SUM(pw.weight) as "Position Weight",
+            fc.top10_weight as "Top-10 Weight",
+            fc.active_share as "Active Share"
+        FROM position_weights pw
+        JOIN securities s ON s.id = pw.security_id
+        JOIN fund_concentration fc
+            ON fc.quarter = pw.quarter AND fc.hedge_fund_id = pw.hedge_fund_id
+        JOIN hedge_funds hf ON hf.id = pw.hedge_fund_id
+        WHERE pw.quarter = :quarter AND s.ticker = :ticker
+        GROUP BY hf.id, hf.name, fc.top10_weight, fc.active_share
+        ORDER BY "Position Weight" DESC
+    """
+    return pd.read_sql(text(query), conn, params={"ticker": ticker, "quarter": quarter})
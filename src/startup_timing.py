@@ -0,0 +1,97 @@
+"""
+Dashboard Startup Timing
+========================
+
+Measures time-to-first-render of the Streamlit app after a restart.
+
+Each run starts a fresh Python process (cold imports, empty query caches) and
+renders the app once with Streamlit's ``AppTest`` harness, timed from after
+the harness itself is imported. The app's own per-phase ``[startup]`` report
+is echoed alongside the wall-clock time, and the command fails if the median
+exceeds the budget.
+
+Usage:
+    python -m src.startup_timing                   # 3 runs, 3000ms budget
+    python -m src.startup_timing --runs 5 --budget-ms 2000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+APP_PATH = os.path.join(os.path.dirname(__file__), "..", "streamlit", "app.py")
+
+RUNNER = """
+import json, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+app = AppTest.from_file({app!r}, default_timeout={timeout})
+app.run()
+print(json.dumps({{
+    "ms": (time.perf_counter() - start) * 1000,
+    "exceptions": [str(e.value) for e in app.exception],
+}}))
+"""
+
+
+def time_first_render(timeout: int = 60) -> tuple[float, str]:
+    """Render the app once in a fresh process. Returns (ms, startup report)."""
+    code = RUNNER.format(app=os.path.abspath(APP_PATH), timeout=timeout)
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=timeout * 2,
+    )
+
+    lines = result.stdout.strip().splitlines()
+    outcome = json.loads(lines[-1])
+    if outcome["exceptions"]:
+        raise RuntimeError(f"App raised: {outcome['exceptions']}")
+
+    report = next((line for line in lines if line.startswith("[startup]")), "")
+    return outcome["ms"], report
+
+
+def main(runs: int = 3, budget_ms: float = 3000) -> bool:
+    print("=" * 60)
+    print("Dashboard Startup Timing")
+    print("=" * 60)
+
+    times = []
+    for i in range(1, runs + 1):
+        ms, report = time_first_render()
+        times.append(ms)
+        print(f"  Run {i}: {ms:.0f}ms  {report}")
+
+    median = statistics.median(times)
+    within_budget = median <= budget_ms
+
+    print()
+    print("=" * 60)
+    print(
+        f"Median: {median:.0f}ms | Max: {max(times):.0f}ms | Budget: {budget_ms:.0f}ms"
+    )
+    print("Within budget" if within_budget else "OVER BUDGET")
+    print("=" * 60)
+    return within_budget
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure dashboard time-to-first-render after a restart"
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=3000,
+        help="Fail if the median time-to-first-render exceeds this",
+    )
+    args = parser.parse_args()
+
+    sys.exit(0 if main(runs=args.runs, budget_ms=args.budget_ms) else 1)
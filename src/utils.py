@@ -1,4 +1,12 @@
 from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+import os
+
+load_dotenv()
+
+
+USER_AGENT = f"{os.environ.get("APP_NAME")} {os.environ.get("EMAIL")}"
 
 
 def get_latest_quarter() -> tuple[int, int]: